@@ -1,8 +1,12 @@
 import os
 import csv
 import re
-from html import unescape
+from html import escape as esc
+from itertools import islice
+from typing import Iterable
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 
 # =========================
 # Configuration
@@ -24,19 +28,51 @@ SKYLINE_TEAM_NAME = "Ann Arbor Skyline"
 
 MEETS_DIR = "meets"
 
+# Home page fragments, filled with .format() per race / runner
+_ARTICLE_OPEN_TPL = """
+    <article>
+        <h2>{meet}</h2>
+        <p>{meet_date}</p>
+        <h3>Top Skyline Runners</h3>
+        <dl>
+"""
+_DT_LINK_TPL = """
+            <dt><a href="{link}">{name}</a></dt><dd>{time}</dd>
+            """
+_DT_TPL = """
+            <dt>{name}</dt><dd>{time}</dd>
+            """
+_ARTICLE_CLOSE_TPL = """
+        </dl>
+        
+        <p><a href={race_html_file}>Meet Results</a></p>
+    </article>
+    """
+_LI_TPL = """
+    <li>
+      <a href="{link}">{name}</a>
+    </li>
+    """
+
 # =========================
 # Helpers
 # =========================
 
-def strip_html(text: str) -> str:
-    """Convert HTML-ish summary into plain text."""
-    if not text:
-        return ""
-    text = unescape(text)
-    text = re.sub(r"<[^>]+>", "", text)
-    return " ".join(text.split()).strip()
+_NONWORD_RE = re.compile(r"[^\w\s-]")
+_WS_RE = re.compile(r"\s+")
+
+_MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+# Fast path for the canonical 'Tue Sep 10 2024' shape; anything else goes to strptime
+_DATE_RE = re.compile(
+    r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) ([A-Z][a-z]{2}) (\d{1,2}) (\d{4})", re.ASCII
+).fullmatch
+_DATE_CACHE: dict[str, datetime] = {}
 
 
+@lru_cache(maxsize=1024)
 def ordinal(place_str: str) -> str:
     """Convert '23.' or '23' to '23rd' etc."""
     if not place_str:
@@ -53,13 +89,31 @@ def ordinal(place_str: str) -> str:
         suf = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
     return f"{n}{suf}"
 
-# def parse_date(date_str: str) -> datetime:
-#     return datetime.strptime(date_str.strip(), "%b %d %Y")
+def parse_meet_date(date_str: str) -> datetime:
+    """Parse a meet date like 'Tue Sep 10 2024' (memoized per string)."""
+    d = _DATE_CACHE.get(date_str)
+    if d is None:
+        m = _DATE_RE(date_str)
+        if m is not None:
+            month, day, year = m.groups()
+            try:
+                d = datetime(int(year), _MONTHS[month], int(day))
+            except (ValueError, KeyError):
+                pass
+        if d is None:
+            d = datetime.strptime(date_str, "%a %b %d %Y")
+        _DATE_CACHE[date_str] = d
+    return d
 
 
 def read_lines(path: str) -> list[str]:
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        return [line.rstrip("\n") for line in f]
+    with open(path, "r", encoding="utf-8", errors="replace", buffering=1 << 20) as f:
+        text = f.read()
+    # Text mode already normalizes line endings to "\n"; split in one C call
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
 
 
 # def find_line_index(lines: list[str], startswith: str) -> int:
@@ -69,54 +123,82 @@ def read_lines(path: str) -> list[str]:
 #             return i
 #     return -1
 
-def find_line_index(lines: list[str], contains: str) -> int:
-    for i, line in enumerate(lines):
-        if contains in line:
-            return i
-    return -1
+def find_header_indices(lines: list[str], hint: tuple[int, int] = (-1, -1)) -> tuple[int, int]:
+    """
+    Return (team_header_idx, indiv_header_idx) from a single pass over lines.
+    Either index is -1 if that header is missing.
+
+    hint is the pair found in another file (meet CSVs share a layout). A hinted
+    line is used only if it really is that header; otherwise, or for a stale
+    hint, the full scan runs as usual.
+    """
+    team_hint, indiv_hint = hint
+    team_header_idx = indiv_header_idx = -1
 
+    if 0 <= team_hint < len(lines) and lines[team_hint].startswith("Place,Team"):
+        team_header_idx = team_hint
+    if 0 <= indiv_hint < len(lines) and lines[indiv_hint].startswith("Place,Grade,Name"):
+        indiv_header_idx = indiv_hint
 
-def parse_csv_block(block_lines: list[str]) -> list[list[str]]:
+    if team_header_idx == -1 or indiv_header_idx == -1:
+        for i, line in enumerate(lines):
+            if team_header_idx == -1 and line.startswith("Place,Team"):
+                team_header_idx = i
+            elif indiv_header_idx == -1 and line.startswith("Place,Grade,Name"):
+                indiv_header_idx = i
+            if team_header_idx != -1 and indiv_header_idx != -1:
+                break
+    return team_header_idx, indiv_header_idx
+
+
+def parse_csv_block(block_lines: Iterable[str]) -> list[list[str]]:
     """
-    Parse a list of CSV lines into rows using csv.reader.
+    Parse CSV lines into rows using csv.reader, dropping blank rows.
     This respects quoted commas.
     """
     reader = csv.reader(block_lines)
     return [row for row in reader if any(cell.strip() for cell in row)]
 
 
-def safe_get(row_dict: dict, key: str, default: str = "") -> str:
-    val = row_dict.get(key, default)
-    return "" if val is None else str(val)
-
-import re
-
 def slugify_filename(name: str) -> str:
     name = name.lower()
-    name = re.sub(r"[^\w\s-]", "", name)  # remove #, (), etc
-    name = re.sub(r"\s+", "_", name)      # spaces → underscores
+    name = _NONWORD_RE.sub("", name)  # remove #, (), etc
+    name = _WS_RE.sub("_", name)      # spaces → underscores
     return name
 
 
-# =========================
-# Main: process all CSVs in current folder
-# =========================
+def emit_article(meet: str, meet_date: str, runners: list[tuple], race_html_file: str) -> str:
+    """Render one Recent Races <article> for the given Skyline runner tuples."""
+    out = [_ARTICLE_OPEN_TPL.format(meet=esc(meet), meet_date=esc(meet_date))]
+    for name, time, _place, _team, pic, _place_int in runners:
+        athlete_id = pic.removesuffix(".jpg").removesuffix(".jpeg")
 
-# PROCESS RECENT RACES
+        if name and athlete_id:
+            athlete_page_link = f"mens_team/{name}{athlete_id}.html"
+            out.append(_DT_LINK_TPL.format(link=esc(athlete_page_link), name=esc(name), time=esc(time)))
+        else:
+            out.append(_DT_TPL.format(name=esc(name), time=esc(time)))
+    out.append(_ARTICLE_CLOSE_TPL.format(race_html_file=esc(race_html_file)))
+    return "".join(out)
 
-recent_races = {} # a dictionary
-# key = race name
-# value = list of [meet_date (str), race_html_filename (str), skyline (list[dict[str, str]])]
 
-for filename in os.listdir(MEETS_DIR):
-    if not filename.lower().endswith(".csv"):
-        continue
+# =========================
+# Main: process all CSVs in current folder
+# =========================
 
-    path = os.path.join(MEETS_DIR, filename)
+def process_one(
+    path: str, header_hint: tuple[int, int] = (-1, -1)
+) -> tuple[str, list, tuple[int, int]] | None:
+    """
+    Parse one meet CSV into (meet_name, [meet_date, skyline, race_html], header
+    indices), or None if skipped. The header indices can be passed back in as
+    header_hint for other files.
+    """
+    filename = os.path.basename(path)
     lines = read_lines(path)
     if len(lines) < 6:
         print(f"Skipping {filename}: not enough lines to match expected format.")
-        continue
+        return None
 
     # ---- Meet metadata (first 4 lines) ----
     meet_name = lines[0].strip()
@@ -125,51 +207,62 @@ for filename in os.listdir(MEETS_DIR):
     summary_html = lines[3].strip() if len(lines) > 3 else ""
 
     # ---- Locate blocks ----
-    team_header_idx = find_line_index(lines, "Place,Team")
-    indiv_header_idx = find_line_index(lines, "Place,Grade,Name")
+    team_header_idx, indiv_header_idx = find_header_indices(lines, header_hint)
     if team_header_idx == -1 or indiv_header_idx == -1:
         print(f"Skipping {filename}: could not find required CSV headers.")
-        continue
+        return None
 
         # ---- Individual results block ----
-    indiv_block_lines = [line for line in lines[indiv_header_idx:] if line.strip() != ""]
-
-    indiv_rows = parse_csv_block(indiv_block_lines)
+    indiv_rows = parse_csv_block(islice(lines, indiv_header_idx, None))
     if len(indiv_rows) < 2:
         print(f"Skipping {filename}: no individual data rows found.")
-        continue
+        return None
 
     indiv_header = indiv_rows[0]
     indiv_data = indiv_rows[1:]
 
-    # Build dicts for each athlete row
-    indiv_dicts = []
-    for row in indiv_data:
-        # Pad short rows (in case a line is missing trailing columns)
-        if len(row) < len(indiv_header):
-            row = row + [""] * (len(indiv_header) - len(row))
-        indiv_dicts.append(dict(zip(indiv_header, row)))
+    # Resolve column positions once per file. A missing column points at index
+    # len(indiv_header), the blank cell every Skyline row is padded with below
+    blank = len(indiv_header)
+    col = {name: i for i, name in enumerate(indiv_header)}
+    i_name, i_time, i_place, i_team, i_pic = (
+        col.get(k, blank) for k in ("Name", "Time", "Place", "Team", "Profile Pic")
+    )
 
-    # Filter Skyline runners
-    skyline = [
-        r for r in indiv_dicts
-        if safe_get(r, "Team").strip() == SKYLINE_TEAM_NAME
-    ]
+    # Filter Skyline runners on the raw rows, before building anything per row.
+    # A header without a Team column just means no Skyline rows.
+    skyline_rows = []
+    if "Team" in col:
+        skyline_rows = [
+            row for row in indiv_data
+            if len(row) > i_team and row[i_team].strip() == SKYLINE_TEAM_NAME
+        ]
+
+    # One tuple per Skyline runner: (name, time, place, team, profile_pic, place_int)
+    skyline = []
+    for row in skyline_rows:
+        # Pad short rows (in case a line is missing trailing columns) and end
+        # every row with the blank cell; cells past the header are ignored
+        row = row[:blank] + [""] * (blank + 1 - min(len(row), blank))
+        place = row[i_place].strip()
+        p = place.rstrip(".")
+        skyline.append((
+            row[i_name].strip(),
+            row[i_time].strip(),
+            place,
+            row[i_team].strip(),
+            row[i_pic].strip(),
+            int(p) if p.isdigit() else 999999,
+        ))
 
     # If no Skyline rows, show a message but still build page
     skyline_rows_html = "" # we don't technically need this skyline_rows_html markup
     if skyline:
         # Sort by numeric place if possible
-        def place_key(r):
-            p = safe_get(r, "Place").strip().rstrip(".")
-            return int(p) if p.isdigit() else 999999
-
-        skyline.sort(key=place_key)
+        skyline.sort(key=itemgetter(5))
 
-        for r in skyline:
-            name = safe_get(r, "Name")
-            time = safe_get(r, "Time")
-            place = ordinal(safe_get(r, "Place"))
+        for name, time, place, _team, _pic, _place_int in skyline:
+            place = ordinal(place)
 
             skyline_rows_html += f"""
         <tr>
@@ -187,13 +280,42 @@ for filename in os.listdir(MEETS_DIR):
     #safe_name = slugify_filename(base)#
     race_html = f"{MEETS_DIR}/{base}_race_page.html"
 
-    recent_races[meet_name] = [
+    return meet_name, [
         meet_date,
         skyline,
         race_html
-    ]
+    ], (team_header_idx, indiv_header_idx)
 
-home_html = f"""<!doctype html>
+
+# PROCESS RECENT RACES
+
+recent_races = {} # a dictionary
+# key = race name
+# value = list of [meet_date (str), skyline (list[tuple[str, ...]]), race_html_filename (str)]
+
+roster = {}
+# key = runner name
+# value = full athlete page path
+
+with os.scandir(MEETS_DIR) as it:
+    csv_paths = [e.path for e in it if e.is_file() and e.name.endswith((".csv", ".CSV"))]
+
+# Parsing a few hundred rows per file is CPU-bound, so files are handled one
+# after another; each file's header positions become the hint for the next
+header_hint = (-1, -1)
+for path in csv_paths:
+    result = process_one(path, header_hint)
+    if result is not None:
+        meet_name, race_info, header_hint = result
+        recent_races[meet_name] = race_info
+
+        for name, _time, _place, _team, pic, _place_int in race_info[1]:
+            athlete_id = pic.removesuffix(".jpg").removesuffix(".jpeg")
+
+            if name and athlete_id and name not in roster:
+                roster[name] = f"mens_team/{name}{athlete_id}.html"
+
+parts: list[str] = [f"""<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8" />
@@ -214,14 +336,9 @@ home_html = f"""<!doctype html>
 
 <main>
   <h2>Recent Races</h2>
-"""
+"""]
 
-sorted_keys = sorted(
-    recent_races,
-    key=lambda race: datetime.strptime(
-        recent_races[race][0], "%a %b %d %Y"
-    )
-)
+sorted_keys = sorted(recent_races, key=lambda race: parse_meet_date(recent_races[race][0]))
 
 for meet in sorted_keys:
     race_info = recent_races[meet]
@@ -229,38 +346,8 @@ for meet in sorted_keys:
     skyline_runners = race_info[1]
     race_html_file = race_info[2]
 
-    home_html += f"""
-    <article>
-        <h2>{meet}</h2>
-        <p>{meet_date}</p>
-        <h3>Top Skyline Runners</h3>
-        <dl>
-"""
-    for r in skyline_runners[:4]:
-        name = safe_get(r, "Name")
-        time = safe_get(r, "Time")
-        athlete_id = safe_get(r, "Profile Pic").replace('.jpg', '').replace('.jpeg', '')
-
-        if name and athlete_id:
-            athlete_page_link = f"mens_team/{name}{athlete_id}.html"
-            home_html += f"""
-            <dt><a href="{athlete_page_link}">{name}</a></dt><dd>{time}</dd>
-            """
-        else:
-            home_html += f"""
-            <dt>{name}</dt><dd>{time}</dd>
-            """
-        # print(name, time)
-        #home_html += f"""
-            #<dt>{name}</dt><dd>{time}</dd>
-        #"""
-    home_html += f"""
-        </dl>
-        
-        <p><a href={race_html_file}>Meet Results</a></p>
-    </article>
-    """
-home_html += f"""
+    parts.append(emit_article(meet, meet_date, skyline_runners[:4], race_html_file))
+parts.append(f"""
 </main>
 
 <section class="roster-section">
@@ -269,39 +356,23 @@ home_html += f"""
   </button>
 
     <ul id="roster-list" class="roster-list" hidden>
-"""
+""")
 
-roster = {}
-# key = runner name
-# value = full athlete page path
+for name, link in sorted(roster.items()):
+    parts.append(_LI_TPL.format(link=esc(link), name=esc(name)))
 
-for meet_name, (meet_date, skyline, race_html) in recent_races.items():
-    for r in skyline:
-        name = safe_get(r, "Name")
-        athlete_id = safe_get(r, "Profile Pic").replace(".jpg", "").replace(".jpeg", "")
-
-        if name and athlete_id and name not in roster:
-            roster[name] = f"mens_team/{name}{athlete_id}.html"
-
-for name in sorted(roster):
-    link = roster[name]
-    home_html += f"""
-    <li>
-      <a href="{link}">{name}</a>
-    </li>
-    """
-
-home_html += """
+parts.append("""
   </ul>
 </section>
 
 <footer>
     <p>All data gathered from Garrett's race spreadsheet. Thanks Garrett!</p>
 </footer>
-"""
+""")
 
+home_html = "".join(parts)
 
-with open("index.html", "w", encoding="utf-8") as f:
-    f.write(home_html)
+with open("index.html", "wb") as f:
+    f.write(home_html.encode("utf-8"))
 
 print(f"Generated index.html with {len(recent_races)} races")
\ No newline at end of file
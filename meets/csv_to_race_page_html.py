@@ -2,8 +2,10 @@ import csv
 import html
 import os
 import re
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # Hosted site root (used for CSS + image links in the generated HTML)
 BASE_URL = "https://umsicomplexwebdesign.github.io/xc_data/"
@@ -14,20 +16,29 @@ SKYLINE_LOGO_URL = (
     "a2schoolsorg/udbk8bxpqrgvjkwteeut/SkylineHighSchoolPrimaryThumbnailImage.jpg"
 )
 
+_BR_RE = re.compile(r"<\s*br\s*/?>", re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+_MEET_ID_RE = re.compile(r"/meet/(\d+)")
+
+# html.escape is a chain of C-level str.replace calls, which beats a
+# str.translate table with multi-character replacements on these short fields
+esc = html.escape
+
 
 def strip_html_tags(s: str) -> str:
     """Convert a small HTML snippet into plain text (keeps line breaks)."""
-    s = re.sub(r"<\s*br\s*/?>", "\n", s, flags=re.I)
-    s = re.sub(r"<[^>]+>", "", s)
+    s = _BR_RE.sub("\n", s)
+    s = _TAG_RE.sub("", s)
     return html.unescape(s).strip()
 
 
 def extract_meet_id(url: str) -> Optional[str]:
     """Extract the numeric meet id from an Athletic.net URL."""
-    m = re.search(r"/meet/(\d+)", url)
+    m = _MEET_ID_RE.search(url)
     return m.group(1) if m else None
 
 
+@lru_cache(maxsize=1024)
 def ordinal(place: str) -> str:
     """Convert '23.' -> '23rd'. If not numeric, return original."""
     place = place.strip().rstrip(".")
@@ -41,6 +52,21 @@ def ordinal(place: str) -> str:
     return f"{n}{suf}"
 
 
+# One Skyline results row: name cell, time, placement, grade
+_RUNNER_ROW_TPL = "      <tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>\n"
+
+
+def emit_runner_rows(rows: List[Tuple[str, str, str, str, str]]) -> str:
+    """Render Skyline table rows from flat (name, time, place, grade, athlete_link) tuples."""
+    fmt = _RUNNER_ROW_TPL.format
+    out: List[str] = []
+    for name, time, place, grade, athlete_link in rows:
+        name_text = esc(name)
+        name_cell = f'<a href="{esc(athlete_link)}">{name_text}</a>' if athlete_link else name_text
+        out.append(fmt(name_cell, esc(time), esc(ordinal(place)), esc(grade)))
+    return "".join(out)
+
+
 def parse_custom_meet_csv(csv_filename: str) -> Dict:
     """
     Parse the custom meet CSV format used by the existing builder.
@@ -53,63 +79,65 @@ def parse_custom_meet_csv(csv_filename: str) -> Dict:
       Row 4..N: Team Results table (3 cols) until a blank row
       Next: Individual Results header (8 cols), then data rows to EOF
     """
+    team_results: List[Dict[str, str]] = []
+    individual_results: List[Dict[str, str]] = []
+
     with open(csv_filename, newline="", encoding="utf-8") as f:
         reader = csv.reader(f)
-        rows = list(reader)
+        meta_rows = list(islice(reader, 4))
+        n_rows = len(meta_rows)
+
+        # Single pass over the rest: team block until the first blank row,
+        # then an optional individual header, then individual rows to EOF
+        state = "team"
+        for row in reader:
+            n_rows += 1
+            blank = not any(row) or not any(c.strip() for c in row)
+
+            if state == "team":
+                if blank:
+                    state = "indiv_header"
+                elif len(row) >= 3 and row[0].strip() != "Place":
+                    team_results.append(
+                        {"place": row[0].strip(), "team": row[1].strip(), "score": row[2].strip()}
+                    )
+                continue
+
+            if state == "indiv_header":
+                state = "indiv"
+                if len(row) >= 8 and row[0].strip() == "Place":
+                    continue
+
+            if blank or len(row) < 8:
+                continue
+
+            individual_results.append(
+                {
+                    "place": row[0].strip(),
+                    "grade": row[1].strip(),
+                    "name": row[2].strip(),
+                    "athlete_link": row[3].strip(),
+                    "time": row[4].strip(),
+                    "team": row[5].strip(),
+                    "team_link": row[6].strip(),
+                    "profile_pic": row[7].strip(),
+                }
+            )
 
-    if len(rows) < 5:
+    if n_rows < 5:
         raise ValueError("CSV file must have at least 5 rows.")
 
-    meet_name = rows[0][0].strip()
-    meet_date = rows[1][0].strip()
-    meet_url = rows[2][0].strip()
+    meet_name = meta_rows[0][0].strip()
+    meet_date = meta_rows[1][0].strip()
+    meet_url = meta_rows[2][0].strip()
 
-    summary_raw = rows[3][0].strip()
+    summary_raw = meta_rows[3][0].strip()
     if (summary_raw.startswith('"') and summary_raw.endswith('"')) or (
         summary_raw.startswith("'") and summary_raw.endswith("'")
     ):
         summary_raw = summary_raw[1:-1]
     summary_text = strip_html_tags(summary_raw)
 
-    # Team results
-    team_results: List[Dict[str, str]] = []
-    i = 4
-    while i < len(rows):
-        row = rows[i]
-        if len(row) == 0 or all(c.strip() == "" for c in row):
-            i += 1
-            break
-        if len(row) >= 3 and row[0].strip() != "Place":
-            team_results.append(
-                {"place": row[0].strip(), "team": row[1].strip(), "score": row[2].strip()}
-            )
-        i += 1
-
-    # Individual results
-    individual_results: List[Dict[str, str]] = []
-    if i < len(rows) and len(rows[i]) >= 8 and rows[i][0].strip() == "Place":
-        i += 1
-
-    for j in range(i, len(rows)):
-        row = rows[j]
-        if len(row) == 0 or all(c.strip() == "" for c in row):
-            continue
-        if len(row) < 8:
-            continue
-
-        individual_results.append(
-            {
-                "place": row[0].strip(),
-                "grade": row[1].strip(),
-                "name": row[2].strip(),
-                "athlete_link": row[3].strip(),
-                "time": row[4].strip(),
-                "team": row[5].strip(),
-                "team_link": row[6].strip(),
-                "profile_pic": row[7].strip(),
-            }
-        )
-
     return {
         "meet_name": meet_name,
         "meet_date": meet_date,
@@ -157,7 +185,7 @@ def build_race_page_html(meet: Dict, repo_root: Optional[str] = None, include_te
     skyline = [r for r in meet["individual_results"] if r["team"].strip().lower() == "ann arbor skyline"]
     runners = skyline if skyline else meet["individual_results"]
 
-    summary_html = html.escape(meet["summary_text"]).replace("\n", "<br>\n")
+    summary_html = esc(meet["summary_text"]).replace("\n", "<br>\n")
 
     parts: List[str] = []
     parts.append(f"""<!doctype html>
@@ -165,7 +193,7 @@ def build_race_page_html(meet: Dict, repo_root: Optional[str] = None, include_te
 <head>
   <meta charset="utf-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1" />
-  <title>{html.escape(meet["meet_name"])}</title>
+  <title>{esc(meet["meet_name"])}</title>
   <link rel="stylesheet" href="{css_reset}">
   <link rel="stylesheet" href="{css_style}">
 </head>
@@ -177,8 +205,8 @@ def build_race_page_html(meet: Dict, repo_root: Optional[str] = None, include_te
   <div class="header-content">
     <img src="{SKYLINE_LOGO_URL}" alt="Skyline High School logo">
     <div class="header-text">
-      <h1>{html.escape(meet["meet_name"])}</h1>
-      <p>{html.escape(meet["meet_date"])} <a href="{html.escape(meet["meet_url"])}">Meet results</a></p>
+      <h1>{esc(meet["meet_name"])}</h1>
+      <p>{esc(meet["meet_date"])} <a href="{esc(meet["meet_url"])}">Meet results</a></p>
     </div>
   </div>
 </header>
@@ -190,7 +218,7 @@ def build_race_page_html(meet: Dict, repo_root: Optional[str] = None, include_te
 """)
 
     if meet_photo_url:
-        parts.append(f'  <img src="{meet_photo_url}" alt="{html.escape(meet["meet_name"])} photo">\n')
+        parts.append(f'  <img src="{meet_photo_url}" alt="{esc(meet["meet_name"])} photo">\n')
 
     parts.append("""  <table>
     <caption>Skyline Results</caption>
@@ -205,19 +233,10 @@ def build_race_page_html(meet: Dict, repo_root: Optional[str] = None, include_te
     <tbody>
 """)
 
-    for r in runners:
-        name_text = html.escape(r["name"])
-        athlete_link = r.get("athlete_link", "").strip()
-        name_cell = f'<a href="{html.escape(athlete_link)}">{name_text}</a>' if athlete_link else name_text
-
-        time_cell = html.escape(r["time"])
-        placement_cell = html.escape(ordinal(r["place"]))
-        grade_cell = html.escape(r["grade"])
-
-        parts.append(
-            f"      <tr><td>{name_cell}</td><td>{time_cell}</td>"
-            f"<td>{placement_cell}</td><td>{grade_cell}</td></tr>\n"
-        )
+    parts.append(emit_runner_rows([
+        (r["name"], r["time"], r["place"], r["grade"], r.get("athlete_link", "").strip())
+        for r in runners
+    ]))
 
     parts.append("    </tbody>\n  </table>\n")
 
@@ -235,9 +254,9 @@ def build_race_page_html(meet: Dict, repo_root: Optional[str] = None, include_te
 """)
         for t in meet["team_results"]:
             parts.append(
-                f'      <tr><td>{html.escape(t["place"])}</td>'
-                f'<td>{html.escape(t["team"])}</td>'
-                f'<td>{html.escape(t["score"])}</td></tr>\n'
+                f'      <tr><td>{esc(t["place"])}</td>'
+                f'<td>{esc(t["team"])}</td>'
+                f'<td>{esc(t["score"])}</td></tr>\n'
             )
         parts.append("    </tbody>\n  </table>\n")
 
@@ -263,7 +282,7 @@ def csv_to_race_page(csv_filename: str, output_folder: str, repo_root: Optional[
     out_file = output_folder_path / (Path(csv_filename).stem + ".html")
     html_content = build_race_page_html(meet, repo_root=repo_root)
 
-    out_file.write_text(html_content, encoding="utf-8")
+    out_file.write_bytes(html_content.encode("utf-8"))
     return str(out_file)
 
 
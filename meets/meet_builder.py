@@ -2,6 +2,10 @@ import os
 import csv
 import re
 from html import unescape
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable
 
 # =========================
 # Configuration
@@ -26,15 +30,24 @@ SKYLINE_TEAM_NAME = "Ann Arbor Skyline"
 # Helpers
 # =========================
 
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# The only entities that show up in meet summaries; anything else goes through html.unescape
+_ENTITY_RE = re.compile(r"&(amp|lt|gt|quot|#39|nbsp);")
+_ENTS = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "#39": "'", "nbsp": " "}
+
 def strip_html(text: str) -> str:
     """Convert HTML-ish summary into plain text."""
     if not text:
         return ""
-    text = unescape(text)
-    text = re.sub(r"<[^>]+>", "", text)
-    return " ".join(text.split()).strip()
+    if "&" in text:
+        unescaped, n = _ENTITY_RE.subn(lambda m: _ENTS[m.group(1)], text)
+        # Fall back to the full HTML5 table if any '&' wasn't a known entity
+        text = unescaped if n == text.count("&") else unescape(text)
+    return " ".join(_TAG_RE.sub("", text).split())
 
 
+@lru_cache(maxsize=1024)
 def ordinal(place_str: str) -> str:
     """Convert '23.' or '23' to '23rd' etc."""
     if not place_str:
@@ -53,8 +66,13 @@ def ordinal(place_str: str) -> str:
 
 
 def read_lines(path: str) -> list[str]:
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        return [line.rstrip("\n") for line in f]
+    with open(path, "r", encoding="utf-8", errors="replace", buffering=1 << 20) as f:
+        text = f.read()
+    # Text mode already normalizes line endings to "\n"; split in one C call
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
 
 
 def find_line_index(lines: list[str], startswith: str) -> int:
@@ -65,9 +83,9 @@ def find_line_index(lines: list[str], startswith: str) -> int:
     return -1
 
 
-def parse_csv_block(block_lines: list[str]) -> list[list[str]]:
+def parse_csv_block(block_lines: Iterable[str]) -> list[list[str]]:
     """
-    Parse a list of CSV lines into rows using csv.reader.
+    Parse CSV lines into rows using csv.reader, dropping blank rows.
     This respects quoted commas.
     """
     reader = csv.reader(block_lines)
@@ -90,11 +108,12 @@ def underscore_name(name: str) -> str:
 # Main: process all CSVs in current folder
 # =========================
 
-for filename in os.listdir("."):
-    if not filename.lower().endswith(".csv"):
-        continue
+with os.scandir(".") as it:
+    csv_entries = [e for e in it if e.is_file() and e.name.endswith((".csv", ".CSV"))]
 
-    lines = read_lines(filename)
+for entry in csv_entries:
+    filename = entry.name
+    lines = read_lines(entry.path)
     if len(lines) < 6:
         print(f"Skipping {filename}: not enough lines to match expected format.")
         continue
@@ -123,9 +142,7 @@ for filename in os.listdir("."):
     #     team_block_lines.append(lines[i])
 
     # ---- Individual results block ----
-    indiv_block_lines = [line for line in lines[indiv_header_idx:] if line.strip() != ""]
-
-    indiv_rows = parse_csv_block(indiv_block_lines)
+    indiv_rows = parse_csv_block(islice(lines, indiv_header_idx, None))
     if len(indiv_rows) < 2:
         print(f"Skipping {filename}: no individual data rows found.")
         continue
@@ -133,36 +150,40 @@ for filename in os.listdir("."):
     indiv_header = indiv_rows[0]
     indiv_data = indiv_rows[1:]
 
-    # Build dicts for each athlete row
-    indiv_dicts = []
-    for row in indiv_data:
+    # Filter Skyline runners on the raw rows, before building any dicts.
+    # A header without a Team column just means no Skyline rows.
+    i_team = indiv_header.index("Team") if "Team" in indiv_header else -1
+    skyline_rows = []
+    if i_team != -1:
+        skyline_rows = [
+            row for row in indiv_data
+            if len(row) > i_team and row[i_team].strip() == SKYLINE_TEAM_NAME
+        ]
+
+    # Build dicts for each Skyline row
+    skyline = []
+    for row in skyline_rows:
         # Pad short rows (in case a line is missing trailing columns)
         if len(row) < len(indiv_header):
             row = row + [""] * (len(indiv_header) - len(row))
-        indiv_dicts.append(dict(zip(indiv_header, row)))
-
-    # Filter Skyline runners
-    skyline = [
-        r for r in indiv_dicts
-        if safe_get(r, "Team").strip() == SKYLINE_TEAM_NAME
-    ]
+        skyline.append(dict(zip(indiv_header, row)))
 
     # If no Skyline rows, show a message but still build page
     skyline_rows_html = ""
     if skyline:
         # Sort by numeric place if possible
-        def place_key(r):
+        for r in skyline:
             p = safe_get(r, "Place").strip().rstrip(".")
-            return int(p) if p.isdigit() else 999999
+            r["_place_int"] = int(p) if p.isdigit() else 999999
 
-        skyline.sort(key=place_key)
+        skyline.sort(key=itemgetter("_place_int"))
 
         for r in skyline:
             name = safe_get(r, "Name")
             time = safe_get(r, "Time")
             place = ordinal(safe_get(r, "Place"))
             grade = safe_get(r, "Grade")
-            athlete_id = safe_get(r, "Profile Pic").replace('.jpg', '').replace('.jpeg', '')
+            athlete_id = safe_get(r, "Profile Pic").removesuffix(".jpg").removesuffix(".jpeg")
 
             if name and athlete_id:
                 underscored_name = underscore_name(name)
@@ -238,7 +259,7 @@ for filename in os.listdir("."):
 """
 
     output_file = filename[:-4] + OUTPUT_SUFFIX
-    with open(output_file, "w", encoding="utf-8") as out:
-        out.write(html)
+    with open(output_file, "wb") as out:
+        out.write(html.encode("utf-8"))
 
     print(f"Generated {output_file} ({len(skyline)} Skyline runners)")
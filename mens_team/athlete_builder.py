@@ -1,8 +1,13 @@
 import csv
-import glob
+import json
+import math
 import os
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
 from html import escape
+from itertools import chain, groupby, islice
 
 # =========================
 # Configuration
@@ -26,11 +31,38 @@ DEFAULT_INPUT_DIRS = ["mens_team", "womens_team"]
 
 OUTPUT_EXT = ".html"
 
+# How many leading rows to read while looking for the athlete data header
+MAX_HEADER_SCAN = 20
+
+# Below this many files, starting worker processes costs more than it saves: a
+# page is ~0.2 ms of work, while importing concurrent.futures.process and starting
+# the pool costs ~50-70 ms and each file adds IPC. A full team folder (~70 files)
+# builds in ~0.05 s serially vs ~0.1 s pooled, so only very large folders on
+# multi-core machines are worth splitting up
+MIN_FILES_FOR_POOL = 1000
+
+# Files handed to a worker per round trip, to amortize the IPC cost
+POOL_CHUNKSIZE = 64
+
+# Remembers each CSV's (mtime, size) from its last successful build so unchanged
+# athletes can be skipped; kept next to this script
+CACHE_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".xc_cache.json")
+
+# Editing the builder itself invalidates every cached page
+BUILDER_MTIME_NS = os.stat(os.path.abspath(__file__)).st_mtime_ns
+
 
 # =========================
 # Helpers
 # =========================
 
+# Annotation characters seen on times ('PR', 'SR', '*') plus whitespace
+_TIME_NOISE = str.maketrans("", "", "PRSprs* \t")
+_TIME_KEEP_RE = re.compile(r"[^0-9:\.]")
+_NEEDS_ESCAPE = re.compile(r"[&<>\"']").search
+_YEAR_RE = re.compile(r"\d{4}").fullmatch
+_INT_RE = re.compile(r"\d+").fullmatch
+
 def athletic_profile_url(athlete_id: str) -> str:
     athlete_id = athlete_id.strip()
     return f"https://www.athletic.net/athlete/{athlete_id}/cross-country/" if athlete_id else "#"
@@ -41,6 +73,12 @@ def hosted_profile_img_url(athlete_id: str) -> str:
     return f"{BASE_URL}/images/profiles/{athlete_id}.jpg" if athlete_id else f"{BASE_URL}/images/profiles/default_image.jpg"
 
 
+def _esc(s: str) -> str:
+    """html.escape, but return s untouched when it has nothing to escape."""
+    return escape(s) if _NEEDS_ESCAPE(s) else s
+
+
+@lru_cache(maxsize=1024)
 def ordinal(place_str: str) -> str:
     """Convert '23', '23.', '23 ' -> '23rd' etc. If not numeric, return original."""
     if place_str is None:
@@ -56,27 +94,24 @@ def ordinal(place_str: str) -> str:
     return f"{n}{suf}"
 
 
-def parse_time_to_seconds(t: str):
+def parse_time_to_seconds(t: str) -> float | None:
     """
     Parse times like '16:34.8PR', '17:55.6 SR', '21:08.4' into seconds (float).
     Returns None if parsing fails.
     """
     if not t:
         return None
-    s = str(t).strip()
     # strip common annotations
-    s = re.sub(r"(PR|\*|SR)", "", s, flags=re.IGNORECASE).strip()
-    # keep only digits, colon, dot
-    s = re.sub(r"[^0-9:\.]", "", s)
-    if ":" not in s:
-        return None
-    parts = s.split(":")
-    if len(parts) != 2:
-        return None
+    s = str(t).translate(_TIME_NOISE)
+    mm, sep, ss = s.partition(":")
+    if not (sep and s.isascii() and mm.isdigit() and ss.replace(".", "").isdigit()):
+        # anything unusual: keep only digits, colon, dot
+        s = _TIME_KEEP_RE.sub("", s)
+        mm, sep, ss = s.partition(":")
+        if not sep or ":" in ss:
+            return None
     try:
-        minutes = int(parts[0])
-        seconds = float(parts[1])
-        return minutes * 60 + seconds
+        return int(mm) * 60 + float(ss)
     except ValueError:
         return None
 
@@ -95,10 +130,6 @@ def find_header_index(rows):
     return -1, None
 
 
-def safe_get(d, key, default=""):
-    v = d.get(key, default)
-    return "" if v is None else str(v)
-
 def safe_filename(path):
     """
     Replace spaces with underscores in the filename.
@@ -112,6 +143,19 @@ def safe_filename(path):
 # Parsing athlete CSV
 # =========================
 
+@dataclass(slots=True)
+class Race:
+    grade: str       # may be blank in the CSV; backfilled from the season records
+    meet: str
+    url: str
+    time: str
+    place: str
+    place_int: int   # numeric place for sorting, 999999 if not a number
+    placed: bool     # place is numeric; tells a real 999999 from the sentinel
+    secs: float      # time in seconds, math.inf if it can't be parsed
+    grade_int: int = -999  # numeric grade for sorting, -999 if not a number
+
+
 def parse_athlete_csv(path: str):
     """
     Supports the athlete CSV format you showed:
@@ -124,72 +168,103 @@ def parse_athlete_csv(path: str):
         - Race rows: Meet + Meet URL filled (Grade sometimes blank)
     """
     with open(path, newline="", encoding="utf-8") as f:
-        rows = list(csv.reader(f))
-
-    athlete_name = rows[0][0].strip() if len(rows) > 0 and rows[0] else ""
-    athlete_id = rows[1][0].strip() if len(rows) > 1 and rows[1] else ""
-
-    header_idx, header = find_header_index(rows)
-    if header_idx == -1:
-        raise ValueError(f"Could not find athlete data header row in {path}")
-
-    data_rows = rows[header_idx + 1 :]
-
-    # Normalize header keys
-    header_keys = [h.strip() for h in header]
-    dict_rows = []
-    for r in data_rows:
-        if not any(cell.strip() for cell in r):
-            continue
-        # pad short rows
-        if len(r) < len(header_keys):
-            r = r + [""] * (len(header_keys) - len(r))
-        dict_rows.append(dict(zip(header_keys, r)))
-
-    season_records = []  # [{year, grade, sr_time}]
-    races = []           # [{grade, meet, url, time, place}]
-
-    for dr in dict_rows:
-        overall_place = safe_get(dr, "Overall Place").strip()
-        grade = safe_get(dr, "Grade").strip()
-        time = safe_get(dr, "Time").strip()
-        meet = safe_get(dr, "Meet").strip()
-        meet_url = safe_get(dr, "Meet URL").strip()
-
-        # Season record row: overall_place looks like a year and grade is present
-        if overall_place.isdigit() and len(overall_place) == 4 and grade:
-            season_records.append({
-                "year": overall_place,
-                "grade": grade,
-                "sr": time
-            })
-            continue
-
-        # Race row: has a meet name (and usually URL)
-        if meet:
-            races.append({
-                "grade": grade,         # may be blank in your current CSVs
-                "meet": meet,
-                "url": meet_url or "#",
-                "time": time,
-                "place": overall_place
-            })
-
-    # Determine "most recent grade" from season_records
-    most_recent_grade = None
-    if season_records:
-        # pick the largest year, then its grade
-        season_records_sorted = sorted(
-            season_records,
-            key=lambda x: int(x["year"]) if str(x["year"]).isdigit() else -1
+        reader = csv.reader(f)
+
+        # The header is normally within the first few rows; only read those up front
+        prefix = list(islice(reader, MAX_HEADER_SCAN))
+        header_idx, header = find_header_index(prefix)
+        if header_idx == -1:
+            prefix.extend(reader)
+            header_idx, header = find_header_index(prefix)
+
+        athlete_name = prefix[0][0].strip() if len(prefix) > 0 and prefix[0] else ""
+        athlete_id = prefix[1][0].strip() if len(prefix) > 1 and prefix[1] else ""
+
+        if header_idx == -1:
+            raise ValueError(f"Could not find athlete data header row in {path}")
+
+        # Rows already read past the header, then the rest of the file as it streams in
+        data_rows = chain(islice(prefix, header_idx + 1, None), reader)
+
+        # Normalize header keys and resolve the columns we use once
+        header_keys = [h.strip() for h in header]
+        # A missing column points one past the header, at the blank cell the
+        # padding below adds, so it reads as "" like the old per-row dicts did
+        blank = len(header_keys)
+        col = {k: i for i, k in enumerate(header_keys)}
+        i_place, i_grade, i_time, i_meet, i_url = (
+            col.get(k, blank) for k in ("Overall Place", "Grade", "Time", "Meet", "Meet URL")
         )
-        most_recent_grade = season_records_sorted[-1]["grade"]
-
-    # If race grade is missing, assign to most recent grade (so tables are not empty)
+        has_missing = blank in (i_place, i_grade, i_time, i_meet, i_url)
+        # Rows only need to reach the last column we read, not the full header width
+        row_len = max(i_place, i_grade, i_time, i_meet, i_url) + 1
+
+        season_records = []  # [{year, grade, sr_time}]
+        races: list[Race] = []
+        ungraded: list[Race] = []  # races with a blank grade, filled in after the loop
+
+        # Most recent season seen so far; on equal years the later row wins
+        best_year = -1
+        most_recent_grade = None
+
+        for r in data_rows:
+            if not r:
+                continue
+            if has_missing:
+                r = r[:blank]  # cells past the header must not fill the blank slot
+            # pad short rows
+            if len(r) < row_len:
+                r = r + [""] * (row_len - len(r))
+
+            # Rows with neither a meet nor a grade are padding; skip them
+            # before touching the other columns
+            meet = r[i_meet].strip()
+            grade = r[i_grade].strip()
+            if not (meet or grade):
+                continue
+
+            overall_place = r[i_place].strip()
+
+            # Season record row: overall_place looks like a year and grade is present.
+            # This wins even when a meet is filled in; the length test keeps ordinary
+            # race places away from the regex
+            if grade and len(overall_place) == 4 and _YEAR_RE(overall_place):
+                season_records.append({
+                    "year": overall_place,
+                    "grade": grade,
+                    "sr": r[i_time].strip()
+                })
+                year = int(overall_place)
+                if year >= best_year:
+                    best_year = year
+                    most_recent_grade = grade
+                continue
+
+            # Race row: has a meet name (and usually URL)
+            if meet:
+                p = overall_place.rstrip(".")
+                time = r[i_time].strip()
+                secs = parse_time_to_seconds(time)
+                placed = _INT_RE(p) is not None
+                race = Race(
+                    grade, meet, r[i_url].strip() or "#", time, overall_place,
+                    int(p) if placed else 999999, placed,
+                    math.inf if secs is None else secs,
+                )
+                if grade:
+                    if _INT_RE(grade):
+                        race.grade_int = int(grade)
+                else:
+                    ungraded.append(race)
+                races.append(race)
+
+    # If race grade is missing, assign to most recent grade (so tables are not empty).
+    # A season row may come after the races it covers, so this waits for the whole file
     if most_recent_grade:
-        for r in races:
-            if not r["grade"]:
-                r["grade"] = most_recent_grade
+        g_int = int(most_recent_grade) if _INT_RE(most_recent_grade) else -999
+        for race in ungraded:
+            race.grade = most_recent_grade
+            race.grade_int = g_int
 
     return {
         "name": athlete_name,
@@ -204,35 +279,39 @@ def parse_athlete_csv(path: str):
 # Build bio text
 # =========================
 
-def build_auto_bio(data) -> str:
+def best_races(races: list[Race]) -> tuple[Race | None, Race | None]:
+    """
+    Returns (best placed race, fastest race) using the numbers precomputed in
+    parse_athlete_csv; either is None if no race qualifies. Ties go to the
+    earliest race.
+    """
+    best_place = min(
+        (r for r in races if r.placed), key=attrgetter("place_int"), default=None
+    )
+
+    best_time = min(races, key=attrgetter("secs"), default=None)
+    if best_time is not None and best_time.secs == math.inf:
+        best_time = None
+
+    return best_place, best_time
+
+
+def build_auto_bio(data: dict) -> str:
     """
     Generates a simple, non-embarrassing paragraph from stats available.
     """
     name = data["name"]
     grade = data.get("most_recent_grade") or "?"
-    races = data["races"]
+    best_place, best_time = best_races(data["races"])
 
-    best_time = None
-    best_time_str = None
-    best_place = None
-    best_place_str = None
-    best_place_meet = None
+    # Only format the winning rows
+    best_place_str: str | None = None
+    best_place_meet: str | None = None
+    if best_place is not None:
+        best_place_str = ordinal(best_place.place)
+        best_place_meet = best_place.meet
 
-    for r in races:
-        # best place (lowest numeric)
-        p = str(r.get("place", "")).strip().rstrip(".")
-        if p.isdigit():
-            p_int = int(p)
-            if best_place is None or p_int < best_place:
-                best_place = p_int
-                best_place_str = ordinal(p)
-                best_place_meet = r.get("meet", "")
-
-        # best time (lowest seconds)
-        secs = parse_time_to_seconds(r.get("time", ""))
-        if secs is not None and (best_time is None or secs < best_time):
-            best_time = secs
-            best_time_str = r.get("time", "")
+    best_time_str = best_time.time if best_time is not None else None
 
     parts = []
     parts.append(f"{name} is a Skyline runner currently listed as grade {grade}.")
@@ -249,52 +328,16 @@ def build_auto_bio(data) -> str:
 # HTML generation
 # =========================
 
-def build_grade_tables(races):
-    """
-    Returns HTML for one table per grade, sorted by grade descending, then by meet name.
-    Each table has columns: Race | Time | Placement
-    """
-    # group by grade
-    by_grade = {}
-    for r in races:
-        g = str(r.get("grade", "")).strip() or "Other"
-        by_grade.setdefault(g, []).append(r)
-
-    # sort grade keys as integers when possible, descending
-    def grade_sort_key(g):
-        return int(g) if str(g).isdigit() else -999
-
-    grade_keys = sorted(by_grade.keys(), key=grade_sort_key, reverse=True)
-
-    tables_html = []
-
-    for g in grade_keys:
-        caption = f"{g}th Grade" if str(g).isdigit() else str(g)
-
-        # sort rows by numeric place when possible
-        def place_key(r):
-            p = str(r.get("place", "")).strip().rstrip(".")
-            return int(p) if p.isdigit() else 999999
-
-        rows = sorted(by_grade[g], key=place_key)
-
-        row_html = ""
-        for r in rows:
-            meet = escape(r.get("meet", ""))
-            url = escape(r.get("url", "#"))
-            time = escape(r.get("time", ""))
-            place = escape(ordinal(r.get("place", "")))
-
-            row_html += f"""
+_GRADE_ROW_TPL = """
     <tr>
       <td><a href="{url}">{meet}</a></td>
       <td>{time}</td>
       <td>{place}</td>
     </tr>"""
 
-        tables_html.append(f"""
+_GRADE_TABLE_TPL = """
 <table>
-  <caption>{escape(caption)}</caption>
+  <caption>{caption}</caption>
   <thead>
     <tr>
       <th scope="col">Race</th>
@@ -303,27 +346,67 @@ def build_grade_tables(races):
     </tr>
   </thead>
   <tbody>
-    {row_html}
+    {rows}
   </tbody>
 </table>
-""")
+"""
+
+
+def build_grade_tables(races: list[Race]) -> str:
+    """
+    Returns HTML for one table per grade, sorted by grade descending, then by meet name.
+    Each table has columns: Race | Time | Placement
+    """
+    # One sort does both levels: grade descending (integer keys precomputed in
+    # parse_athlete_csv, non-numeric last), then numeric place within a grade.
+    # Labels with the same sort value (JV/Other, 09/9) stay in the order they
+    # first appear, so each still gets one table in a stable position
+    def grade_label(r: Race) -> str:
+        return r.grade or "Other"
+
+    first_seen: dict[str, int] = {}
+    for r in races:
+        first_seen.setdefault(grade_label(r), len(first_seen))
+
+    races_sorted = sorted(
+        races, key=lambda r: (-r.grade_int, first_seen[grade_label(r)], r.place_int)
+    )
+
+    tables_html: list[str] = []
+
+    for g, rows in groupby(races_sorted, key=grade_label):
+        caption = f"{g}th Grade" if str(g).isdigit() else str(g)
+
+        row_parts: list[str] = []
+        for r in rows:
+            row_parts.append(_GRADE_ROW_TPL.format(
+                url=_esc(r.url),
+                meet=_esc(r.meet),
+                time=_esc(r.time),
+                place=_esc(ordinal(r.place)),
+            ))
+
+        tables_html.append(_GRADE_TABLE_TPL.format(caption=_esc(caption), rows="".join(row_parts)))
 
     return "\n".join(tables_html)
 
 
-def generate_runner_page(data) -> str:
-    name = escape(data["name"])
-    athlete_id = escape(data["athlete_id"])
-    grade = escape(data.get("most_recent_grade") or "?")
+# Everything after the grade tables is the same on every page
+_PAGE_FOOT = """
 
-    profile_url = athletic_profile_url(data["athlete_id"])
-    profile_img = hosted_profile_img_url(data["athlete_id"])
+<footer>
+  <p>All data gathered from the team's race spreadsheet.</p>
+</footer>
 
-    bio = escape(build_auto_bio(data))
+<script src="../dist/js/lightbox-plus-jquery.js"></script>
+</body>
+</html>
+"""
 
-    tables = build_grade_tables(data["races"])
 
-    html = f"""<!doctype html>
+# Everything before the grade tables; the logo is filled in once at import so
+# each page only substitutes its own fields
+_PAGE_HEAD_TPL = """<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8" />
@@ -338,7 +421,7 @@ def generate_runner_page(data) -> str:
 <header>
   <div class="header-content">
     <a href="../index.html">
-        <img src="{SKYLINE_LOGO}" alt="Skyline High School logo">
+        <img src="%(logo)s" alt="Skyline High School logo">
     </a>
     <div class="header-text">
       <h1>{name}</h1>
@@ -357,17 +440,37 @@ def generate_runner_page(data) -> str:
   </div>
 </main>
 
-{tables}
+""" % {"logo": SKYLINE_LOGO}
 
-<footer>
-  <p>All data gathered from the team's race spreadsheet.</p>
-</footer>
 
-<script src="../dist/js/lightbox-plus-jquery.js"></script>
-</body>
-</html>
-"""
-    return html
+def generate_runner_page_parts(data) -> list:
+    """
+    Returns the page as [head, tables, footer] segments so callers can write
+    them out in order without building one big string first.
+    """
+    name = _esc(data["name"])
+    athlete_id = _esc(data["athlete_id"])
+    grade = _esc(data.get("most_recent_grade") or "?")
+
+    profile_url = athletic_profile_url(data["athlete_id"])
+    profile_img = hosted_profile_img_url(data["athlete_id"])
+
+    bio = _esc(build_auto_bio(data))
+
+    tables = build_grade_tables(data["races"])
+
+    head = _PAGE_HEAD_TPL.format_map({
+        "name": name,
+        "grade": grade,
+        "profile_url": profile_url,
+        "profile_img": profile_img,
+        "bio": bio,
+    })
+    return [head, tables, _PAGE_FOOT]
+
+
+def generate_runner_page(data) -> str:
+    return "".join(generate_runner_page_parts(data))
 
 
 # =========================
@@ -389,31 +492,128 @@ def find_input_dirs():
         return existing if existing else ["."]
     
 
+def _iter_csvs(d):
+    """CSV files directly inside d, in name order (hidden files skipped, as glob did)."""
+    with os.scandir(d) as it:
+        paths = [
+            e.path for e in it
+            if e.name.endswith(".csv") and not e.name.startswith(".")
+            and e.is_file(follow_symlinks=False)
+        ]
+    return sorted(paths)
+
+
+def write_chunks(path, chunks):
+    """Write pre-encoded byte chunks to path, in a single writev() call where available."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        if hasattr(os, "writev"):
+            written = os.writev(fd, chunks)
+            if written == sum(len(c) for c in chunks):
+                return
+            rest = b"".join(chunks)[written:]  # short write (rare): finish below
+        else:
+            rest = b"".join(chunks)
+        view = memoryview(rest)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def load_manifest():
+    try:
+        with open(CACHE_MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    # Write a sibling temp file and swap it in, so a crash mid-write can't leave
+    # a truncated manifest behind
+    tmp_path = f"{CACHE_MANIFEST}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, CACHE_MANIFEST)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def cache_key(csv_path):
+    """Changes whenever the CSV (or this script) has been modified."""
+    st = os.stat(csv_path)
+    return [st.st_mtime_ns, st.st_size, BUILDER_MTIME_NS]
+
+
+def _process_one(csv_path):
+    """
+    Parse one athlete CSV and write its page.
+    Returns (ok, status line) for main() to record and print.
+    """
+    try:
+        data = parse_athlete_csv(csv_path)
+        parts = generate_runner_page_parts(data)
+
+        ###out_path = os.path.splitext(csv_path)[0] + OUTPUT_EXT
+        out_path = safe_filename(csv_path)
+        write_chunks(out_path, [p.encode("utf-8") for p in parts])
+
+        return True, f"Generated {out_path}"
+
+    except Exception as e:
+        return False, f"ERROR processing {csv_path}: {e}"
+
+
 def main():
     input_dirs = find_input_dirs()
+    manifest = load_manifest()
+    # Only CSVs seen in this run are kept, so deleted athletes drop out
+    seen = {}
 
     for d in input_dirs:
-        pattern = os.path.join(d, "*.csv")
-        csv_files = glob.glob(pattern)
+        csv_files = _iter_csvs(d)
 
         if not csv_files:
             print(f"No CSV files found in {d}")
             continue
 
+        # Skip athletes whose CSV hasn't changed since their page was last built
+        keys = {}
+        pending = []
         for csv_path in csv_files:
-            try:
-                data = parse_athlete_csv(csv_path)
-                html = generate_runner_page(data)
-
-                ###out_path = os.path.splitext(csv_path)[0] + OUTPUT_EXT
-                out_path = safe_filename(csv_path)
-                with open(out_path, "w", encoding="utf-8") as f:
-                    f.write(html)
-
-                print(f"Generated {out_path}")
-
-            except Exception as e:
-                print(f"ERROR processing {csv_path}: {e}")
+            keys[csv_path] = cache_key(csv_path)
+            out_path = safe_filename(csv_path)
+            abs_path = os.path.abspath(csv_path)
+            if manifest.get(abs_path) == keys[csv_path] and os.path.exists(out_path):
+                print(f"Up to date {out_path}")
+                seen[abs_path] = keys[csv_path]
+            else:
+                pending.append(csv_path)
+
+        # Files are independent, so big folders can be spread across processes
+        # (results stay in order); a single CPU would just add a worker's overhead
+        if len(pending) < MIN_FILES_FOR_POOL or (os.cpu_count() or 1) < 2:
+            results = [_process_one(csv_path) for csv_path in pending]
+        else:
+            # Imported here so the usual serial runs skip it
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor() as ex:
+                results = list(ex.map(_process_one, pending, chunksize=POOL_CHUNKSIZE))
+
+        for csv_path, (ok, msg) in zip(pending, results):
+            print(msg)
+            if ok:
+                seen[os.path.abspath(csv_path)] = keys[csv_path]
+
+    save_manifest(seen)
 
 
 if __name__ == "__main__":